@@ -6,6 +6,7 @@ import re
 import argparse
 import logging
 import csv
+from balance import Balance
 
 class AccountBalanceAggregate:
     @staticmethod
@@ -22,27 +23,31 @@ class AccountBalanceAggregate:
     def run(args):
         AccountBalanceAggregate._check_args(args)
 
-        balance_summary = {}
-        for input_file_path in args.input_file_path:
-            input_balance_summary = AccountBalanceAggregate._read_balance_summary(input_file_path)
-            AccountBalanceAggregate._add_balance_summary(balance_summary, input_balance_summary)
-
-        AccountBalanceAggregate._write_balance_summary(balance_summary, args.output_file_path)
+        balance_iterables = [AccountBalanceAggregate.read(input_file_path) for input_file_path in args.input_file_path]
+        balances = AccountBalanceAggregate.aggregate(balance_iterables)
+        AccountBalanceAggregate.write(balances, args.output_file_path)
 
     @staticmethod
-    def _read_balance_summary(input_file_path):
+    def read(input_file_path):
         with open(input_file_path) as f:
             reader = csv.reader(f)
             rows = list(reader)
             rows.pop(0)
-            return rows
+            return [Balance(date=row[0], balance=row[1]) for row in rows]
+
+    @staticmethod
+    def aggregate(balance_iterables):
+        balance_summary = {}
+        for input_balance_summary in balance_iterables:
+            AccountBalanceAggregate._add_balance_summary(balance_summary, input_balance_summary)
+        return [Balance(date=date, balance=balance) for date, balance in sorted(balance_summary.items())]
 
     @staticmethod
-    def _write_balance_summary(balance_summary, output_file_path):
+    def write(balances, output_file_path):
         with open(output_file_path, 'w') as f:
             writer = csv.writer(f)
             writer.writerow(['date', 'balance'])
-            for entry in sorted(balance_summary.items()):
+            for entry in balances:
                 writer.writerow([entry[0], entry[1]])
 
     @staticmethod
@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+
+import collections
+
+
+Balance = collections.namedtuple('Balance', ['date', 'balance'])
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import argparse
+import logging
+import time
+from pdf_text_backend import PdfTextBackend
+from bofa_statement import BofaStatement
+from chase_statement import ChaseStatement
+
+
+class BenchmarkBackends:
+    @staticmethod
+    def parse_args():
+        parser = argparse.ArgumentParser(description='Compare the speed and the results of the pdf text backends')
+
+        parser.add_argument('--input-directory-path', '-i', help='The input directory of statements')
+        parser.add_argument('--bank', choices=['bofa', 'chase'], help='The bank of the statements')
+        parser.add_argument('--account-type', '-t', choices=['checking', 'savings'], help='The account type to look at, for chase only')
+        parser.add_argument('--repeat', '-r', type=int, default=1, help='How many times to extract every statement')
+        parser.add_argument('--verbose', '-v', action='store_true', help='When you want to debug')
+
+        return parser.parse_args()
+
+    @staticmethod
+    def run(args):
+        BenchmarkBackends._config_logging(args.verbose)
+
+        BenchmarkBackends._check_args(args)
+
+        statement_file_paths = BenchmarkBackends._list_file_paths(args.input_directory_path)
+        reference_backend = PdfTextBackend.get_reference_name()
+        available_backends = PdfTextBackend.get_available_names()
+
+        reference_results = None
+        if reference_backend in available_backends:
+            reference_results = BenchmarkBackends._extract_all(args, reference_backend, statement_file_paths)[1]
+
+        print(f'{"backend":<12} {"seconds":>10} {"statements/s":>14} {"matches":>10}')
+        for backend in available_backends:
+            elapsed_seconds = 0.0
+            for _ in range(args.repeat):
+                seconds, results = BenchmarkBackends._extract_all(args, backend, statement_file_paths)
+                elapsed_seconds += seconds
+            throughput = len(statement_file_paths) * args.repeat / elapsed_seconds if elapsed_seconds else 0.0
+            matches = BenchmarkBackends._count_matches(results, reference_results)
+            print(f'{backend:<12} {elapsed_seconds:>10.3f} {throughput:>14.1f} {matches:>10}')
+
+    @staticmethod
+    def _extract_all(args, backend, statement_file_paths):
+        results = []
+        start_time = time.perf_counter()
+        for statement_file_path in statement_file_paths:
+            results.append(BenchmarkBackends._extract(args, backend, statement_file_path))
+        return time.perf_counter() - start_time, results
+
+    @staticmethod
+    def _extract(args, backend, statement_file_path):
+        try:
+            if args.bank == 'bofa':
+                return BofaStatement._process_statement_file(statement_file_path, backend, None)
+            return ChaseStatement._process_statement_file(statement_file_path, args.account_type, backend, None)
+        except Exception as e:
+            logging.debug(f'backend "{backend}" failed on "{statement_file_path}": {e}')
+            return None
+
+    @staticmethod
+    def _count_matches(results, reference_results):
+        if reference_results is None:
+            return 'n/a'
+        matches = sum(1 for result, reference_result in zip(results, reference_results) if result is not None and result == reference_result)
+        return f'{matches}/{len(reference_results)}'
+
+    @staticmethod
+    def _list_file_paths(dir_path):
+        file_paths = []
+        for filename in sorted(os.listdir(dir_path)):
+            file_paths.append(os.path.join(dir_path, filename))
+        return file_paths
+
+    @staticmethod
+    def _check_args(args):
+        if not args.input_directory_path:
+            raise Error('please specify --input-directory-path')
+        if not args.bank:
+            raise Error('please specify --bank')
+        if args.bank == 'chase' and not args.account_type:
+            raise Error('please specify --account-type')
+        if args.repeat < 1:
+            raise Error('--repeat should be at least 1')
+        if not PdfTextBackend.get_available_names():
+            raise Error('no pdf text backend is installed')
+
+    @staticmethod
+    def _config_logging(verbose):
+        log_level = logging.DEBUG if verbose else logging.WARNING
+        log_format = '%(levelname)s: %(message)s'
+        logging.basicConfig(level=log_level, format=log_format)
+
+
+class Error(Exception):
+    pass
+
+
+def main():
+    args = BenchmarkBackends.parse_args()
+    BenchmarkBackends.run(args)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+        sys.exit(0)
+    except Error as e:
+        logging.error(e)
+        sys.exit(1)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import csv
+import subprocess
+import argparse
+import logging
+import resource
+import tempfile
+import time
+from pdf_text_backend import PdfTextBackend
+from bofa_statement import BofaStatement
+from chase_statement import ChaseStatement
+
+
+class BenchmarkStatements:
+    @staticmethod
+    def parse_args():
+        parser = argparse.ArgumentParser(description='Measure the statement extractors on a synthetic corpus')
+
+        parser.add_argument('--bank', choices=['bofa', 'chase'], help='The bank of the statements')
+        parser.add_argument('--account-type', '-t', choices=['checking', 'savings'], default='checking', help='The account type to look at, for chase only')
+        parser.add_argument('--backend', '-b', choices=['auto'] + PdfTextBackend.get_names(), default='pdfplumber', help='The pdf text backend')
+        parser.add_argument('--max-memory-mb', type=int, help='The memory a single statement may take, as in the extractors')
+        parser.add_argument('--count', '-n', type=int, default=20, help='How many statements to generate')
+        parser.add_argument('--page-count', '-p', type=int, default=3, help='How many pages every statement has')
+        parser.add_argument('--filler-line-count', '-f', type=int, default=40, help='How many transaction-like lines every page has')
+        parser.add_argument('--verbose', '-v', action='store_true', help='When you want to debug')
+
+        return parser.parse_args()
+
+    @staticmethod
+    def run(args):
+        BenchmarkStatements._config_logging(args.verbose)
+
+        BenchmarkStatements._check_args(args)
+
+        with tempfile.TemporaryDirectory() as work_directory_path:
+            # the corpus is generated in another process, so its memory doesn't show up in the peak rss
+            statements = BenchmarkStatements._generate_corpus(args, work_directory_path)
+            backend = BenchmarkStatements._select_backend(args)
+
+            start_rss = PdfTextBackend._get_rss_bytes()
+            statement_seconds = []
+            mismatches = 0
+            for statement in statements:
+                start_time = time.perf_counter()
+                result = BenchmarkStatements._extract(args, backend, statement['file_path'])
+                statement_seconds.append(time.perf_counter() - start_time)
+                expected_balance = statement['checking'] if args.bank == 'bofa' else statement[args.account_type]
+                if result != (statement['date'], expected_balance):
+                    logging.warning(f'unexpected result for "{statement["file_path"]}": {result}')
+                    mismatches += 1
+            end_rss = PdfTextBackend._get_rss_bytes()
+
+            page_seconds = []
+            for statement in statements:
+                page_seconds.extend(BenchmarkStatements._time_pages(backend, statement['file_path']))
+
+        statement_milliseconds = sorted(seconds * 1000 for seconds in statement_seconds)
+        page_milliseconds = sorted(seconds * 1000 for seconds in page_seconds)
+        print(f'backend:                  {backend}')
+        print(f'statements:               {len(statements)} x {args.page_count} pages x {args.filler_line_count} filler lines')
+        print(f'mismatches:               {mismatches}')
+        print(f'statements/s:             {len(statements) / sum(statement_seconds):.1f}')
+        print(f'per-statement latency ms: {BenchmarkStatements._summarize(statement_milliseconds)}')
+        print(f'per-page latency ms:      {BenchmarkStatements._summarize(page_milliseconds)} (the first page of a file includes opening it)')
+        # the current rss and the peak come from different counters, so they're only comparable to within a MB or so
+        print(f'current rss MB:           start {start_rss / 1024 / 1024:.1f}, end {end_rss / 1024 / 1024:.1f}')
+        print(f'peak rss MB (ru_maxrss):  {BenchmarkStatements._get_peak_rss_bytes() / 1024 / 1024:.1f}')
+
+        if mismatches:
+            raise Error(f'{mismatches} statements were not extracted as expected')
+
+    @staticmethod
+    def _generate_corpus(args, work_directory_path):
+        corpus_directory_path = os.path.join(work_directory_path, 'corpus')
+        expected_file_path = os.path.join(work_directory_path, 'expected.csv')
+        generator_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'synthetic_statement.py')
+        try:
+            subprocess.run([
+                sys.executable, generator_file_path,
+                '--output-directory-path', corpus_directory_path,
+                '--bank', args.bank,
+                '--count', str(args.count),
+                '--page-count', str(args.page_count),
+                '--filler-line-count', str(args.filler_line_count),
+                '--expected-file-path', expected_file_path,
+            ], check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            raise Error(f'failed to generate the corpus: {e.stderr.strip()}')
+        with open(expected_file_path) as f:
+            return list(csv.DictReader(f))
+
+    @staticmethod
+    def _time_pages(backend, statement_file_path):
+        page_seconds = []
+        page_texts = PdfTextBackend._iter_page_texts(backend, statement_file_path)
+        try:
+            while True:
+                start_time = time.perf_counter()
+                try:
+                    next(page_texts)
+                except StopIteration:
+                    break
+                page_seconds.append(time.perf_counter() - start_time)
+        finally:
+            page_texts.close()
+        return page_seconds
+
+    @staticmethod
+    def _summarize(sorted_milliseconds):
+        mean = sum(sorted_milliseconds) / len(sorted_milliseconds)
+        return f'mean {mean:.2f}, p50 {BenchmarkStatements._percentile(sorted_milliseconds, 50):.2f}, p95 {BenchmarkStatements._percentile(sorted_milliseconds, 95):.2f}'
+
+    @staticmethod
+    def _select_backend(args):
+        try:
+            if args.bank == 'bofa':
+                return BofaStatement._resolve_backend(args.backend)
+            return ChaseStatement._resolve_backend(args.backend)
+        except Exception as e:
+            raise Error(str(e))
+
+    @staticmethod
+    def _extract(args, backend, statement_file_path):
+        try:
+            if args.bank == 'bofa':
+                return BofaStatement._process_statement_file(statement_file_path, backend, args.max_memory_mb)
+            return ChaseStatement._process_statement_file(statement_file_path, args.account_type, backend, args.max_memory_mb)
+        except Exception as e:
+            logging.debug(f'backend "{backend}" failed on "{statement_file_path}": {e}')
+            return None
+
+    @staticmethod
+    def _percentile(sorted_values, percent):
+        index = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+        return sorted_values[index]
+
+    @staticmethod
+    def _get_peak_rss_bytes():
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    @staticmethod
+    def _check_args(args):
+        if not args.bank:
+            raise Error('please specify --bank')
+        if args.count < 1 or args.page_count < 1:
+            raise Error('--count and --page-count should be at least 1')
+        if args.filler_line_count < 0:
+            raise Error('--filler-line-count should not be negative')
+
+    @staticmethod
+    def _config_logging(verbose):
+        log_level = logging.DEBUG if verbose else logging.WARNING
+        log_format = '%(levelname)s: %(message)s'
+        logging.basicConfig(level=log_level, format=log_format)
+
+
+class Error(Exception):
+    pass
+
+
+def main():
+    args = BenchmarkStatements.parse_args()
+    BenchmarkStatements.run(args)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+        sys.exit(0)
+    except Error as e:
+        logging.error(e)
+        sys.exit(1)
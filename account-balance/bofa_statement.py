@@ -6,7 +6,9 @@ import re
 import argparse
 import logging
 import csv
-import pdfplumber
+import json
+from pdf_text_backend import PdfTextBackend
+from balance import Balance
 
 
 class BofaStatement:
@@ -16,6 +18,11 @@ class BofaStatement:
 
         parser.add_argument('--input-directory-path', '-i', help='The input directory of statements')
         parser.add_argument('--output-file-path', '-o', help='The output file of account balance summary')
+        parser.add_argument('--keep-going', '-k', action='store_true', help='Record failing statements and continue with the rest')
+        parser.add_argument('--checkpoint-file-path', '-c', help='The checkpoint journal for --keep-going, defaults to the output file path plus ".checkpoint"')
+        parser.add_argument('--backend', '-b', choices=['auto'] + PdfTextBackend.get_names(), default='pdfplumber', help='The pdf text backend, "auto" picks the fastest installed one and cross-checks it')
+        parser.add_argument('--cross-check', type=int, metavar='N', help='Check the backend against pdfplumber on the first N statements, defaults to 3 for "auto" and 0 otherwise')
+        parser.add_argument('--max-memory-mb', type=int, help='The memory a single statement may take before it is read again with pdfminer, checked between pages')
         parser.add_argument('--verbose', '-v', action='store_true', help='When you want to debug')
 
         return parser.parse_args()
@@ -26,16 +33,163 @@ class BofaStatement:
 
         BofaStatement._check_args(args)
 
+        backend = BofaStatement._select_backend(args)
+
+        if args.keep_going:
+            BofaStatement._run_keep_going(args, backend)
+            return
+
+        balance_summary = list(BofaStatement.extract(args.input_directory_path, backend, args.max_memory_mb))
+        BofaStatement._write_balance_summary(balance_summary, args.output_file_path)
+
+    @staticmethod
+    def extract(input_directory_path, backend='pdfplumber', max_memory_mb=None):
+        backend = BofaStatement._resolve_backend(backend)
+        for statement_file_path in BofaStatement._list_file_paths(input_directory_path):
+            yield BofaStatement._process_statement_file(statement_file_path, backend, max_memory_mb)
+
+    @staticmethod
+    def _run_keep_going(args, backend):
+        checkpoint_file_path = args.checkpoint_file_path or f'{args.output_file_path}.checkpoint'
+        journal = BofaStatement._load_checkpoint_journal(checkpoint_file_path)
+
         balance_summary = []
-        for statement_file_path in BofaStatement._list_file_paths(args.input_directory_path):
-            logging.info(f'processing statement file "{statement_file_path}"...')
-            text = BofaStatement._retrieve_text(statement_file_path)
-            date = BofaStatement._extract_date(text)
-            balance = BofaStatement._extract_balance(text)
-            balance_summary.append([date, balance])
+        failures = []
+        with open(checkpoint_file_path, 'a') as checkpoint_file:
+            for statement_file_path in BofaStatement._list_file_paths(args.input_directory_path):
+                # the file may be gone or a dangling link by now, which is just another failing statement
+                record = {'path': os.path.abspath(statement_file_path)}
+                try:
+                    record = BofaStatement._make_checkpoint_record(statement_file_path, backend)
+                    previous_record = journal.get(record['path'])
+                    if BofaStatement._is_checkpoint_reusable(previous_record, record):
+                        logging.debug(f'skipping processed statement file "{statement_file_path}"')
+                        balance_summary.append([previous_record['date'], previous_record['balance']])
+                        continue
+
+                    used_backends = []
+                    date, balance = BofaStatement._process_statement_file(statement_file_path, backend, args.max_memory_mb, used_backends)
+                    if used_backends[-1] != backend:
+                        record['fallback_backend'] = used_backends[-1]
+                    record['date'] = date
+                    record['balance'] = balance
+                    balance_summary.append([date, balance])
+                except Error as e:
+                    logging.warning(f'failed to process statement file "{statement_file_path}": {e}')
+                    record['error'] = str(e)
+                    failures.append(statement_file_path)
+
+                checkpoint_file.write(json.dumps(record) + '\n')
+                checkpoint_file.flush()
 
         BofaStatement._write_balance_summary(balance_summary, args.output_file_path)
 
+        if failures:
+            raise Error(f'{len(failures)} statement files failed, fix them and rerun to process only those: ' + ', '.join(failures))
+
+    @staticmethod
+    def _process_statement_file(statement_file_path, backend, max_memory_mb, used_backends=None):
+        logging.info(f'processing statement file "{statement_file_path}"...')
+        text = BofaStatement._retrieve_text(statement_file_path, backend, max_memory_mb, used_backends)
+        date = BofaStatement._extract_date(text)
+        balance = BofaStatement._extract_balance(text)
+        return Balance(date=date, balance=balance)
+
+    @staticmethod
+    def _make_checkpoint_record(statement_file_path, backend):
+        try:
+            stat = os.stat(statement_file_path)
+        except OSError as e:
+            raise Error(f'cannot stat statement file: {e}')
+        return {
+            'path': os.path.abspath(statement_file_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'backend': backend,
+        }
+
+    @staticmethod
+    def _is_checkpoint_reusable(previous_record, record):
+        if not previous_record or 'error' in previous_record:
+            return False
+        return all(previous_record.get(key) == value for key, value in record.items())
+
+    @staticmethod
+    def _load_checkpoint_journal(checkpoint_file_path):
+        journal = {}
+        if not os.path.exists(checkpoint_file_path):
+            return journal
+        with open(checkpoint_file_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f'ignoring broken checkpoint line: {line.strip()}')
+                    continue
+                journal[record['path']] = record
+        return journal
+
+    @staticmethod
+    def _get_backend_preference():
+        return ['pypdfium2', 'pymupdf', 'pdfminer', 'pdfplumber']
+
+    @staticmethod
+    def _get_fallback_backend():
+        # pdfminer takes the least memory, and its lines are good enough for the single-line regexes here
+        return 'pdfminer'
+
+    @staticmethod
+    def _select_backend(args):
+        backend = BofaStatement._resolve_backend(args.backend)
+        # a faster backend may split the lines the regexes look for, so "auto" never goes unchecked
+        sample_size = args.cross_check
+        if sample_size is None:
+            sample_size = 3 if args.backend == 'auto' else 0
+        if sample_size:
+            backend = BofaStatement._cross_check_backend(args, backend, sample_size)
+        return backend
+
+    @staticmethod
+    def _resolve_backend(backend):
+        available_backends = PdfTextBackend.get_available_names()
+        if backend == 'auto':
+            candidates = [backend for backend in BofaStatement._get_backend_preference() if backend in available_backends]
+            if not candidates:
+                raise Error('no pdf text backend is installed')
+            backend = candidates[0]
+        elif backend not in available_backends:
+            raise Error(f'pdf text backend "{backend}" is not installed')
+        logging.debug(f'using pdf text backend "{backend}"')
+        return backend
+
+    @staticmethod
+    def _cross_check_backend(args, backend, sample_size):
+        reference_backend = PdfTextBackend.get_reference_name()
+        if backend == reference_backend:
+            return backend
+        if reference_backend not in PdfTextBackend.get_available_names():
+            raise Error(f'cannot cross-check without the "{reference_backend}" backend installed')
+
+        # only statements both backends can read say anything about the backend, an error message isn't a result
+        compared_count = 0
+        for statement_file_path in sorted(BofaStatement._list_file_paths(args.input_directory_path)):
+            if compared_count == sample_size:
+                break
+            try:
+                reference_result = BofaStatement._process_statement_file(statement_file_path, reference_backend, args.max_memory_mb)
+                result = BofaStatement._process_statement_file(statement_file_path, backend, args.max_memory_mb)
+            except Error as e:
+                logging.info(f'skipping "{statement_file_path}" in the cross-check: {e}')
+                continue
+            compared_count += 1
+            if result != reference_result:
+                logging.warning(f'backend "{backend}" disagrees with "{reference_backend}" on "{statement_file_path}" ({result} vs {reference_result}), falling back to "{reference_backend}"')
+                return reference_backend
+        if not compared_count:
+            raise Error(f'cannot cross-check "{backend}", no statement could be read by both it and "{reference_backend}"')
+        logging.info(f'backend "{backend}" matches "{reference_backend}" on {compared_count} sample statements')
+        return backend
+
     @staticmethod
     def _list_file_paths(dir_path):
         file_paths = []
@@ -44,12 +198,11 @@ class BofaStatement:
         return file_paths
 
     @staticmethod
-    def _retrieve_text(pdf_file_path):
-        with pdfplumber.open(pdf_file_path) as pdf:
-            text = ''
-            for page in pdf.pages:
-                text += page.extract_text()
-            return text
+    def _retrieve_text(pdf_file_path, backend, max_memory_mb, used_backends=None):
+        try:
+            return PdfTextBackend.retrieve_text(backend, pdf_file_path, max_memory_mb, used_backends, BofaStatement._get_fallback_backend())
+        except Exception as e:
+            raise Error(f'cannot read pdf file: {e}')
 
     @staticmethod
     def _extract_date(text):
@@ -87,6 +240,8 @@ class BofaStatement:
             'November': '11',
             'December': '12',
         }
+        if human_month not in mapping:
+            raise Error(f'unexpected month format: {human_month}')
         return mapping[human_month]
 
     @staticmethod
@@ -137,6 +292,8 @@ class BofaStatement:
             raise Error('please specify --input-directory-path')
         if not args.output_file_path:
             raise Error('please specify --output-file-path')
+        if args.max_memory_mb is not None and args.max_memory_mb <= 0:
+            raise Error('--max-memory-mb should be positive')
 
     @staticmethod
     def _config_logging(verbose):
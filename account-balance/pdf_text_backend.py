@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import logging
+import gc
+import importlib.util
+
+
+class PdfTextBackend:
+    @staticmethod
+    def get_names():
+        return ['pypdfium2', 'pymupdf', 'pdfminer', 'pdfplumber']
+
+    @staticmethod
+    def get_reference_name():
+        return 'pdfplumber'
+
+    @staticmethod
+    def get_available_names():
+        return [name for name in PdfTextBackend.get_names() if PdfTextBackend._is_available(name)]
+
+    @staticmethod
+    def retrieve_text(name, pdf_file_path, max_memory_mb=None, used_names=None, fallback_name=None):
+        # the ceiling is checked between pages, so a single huge page can still go over it before it is noticed
+        text = PdfTextBackend._retrieve_text_within(name, pdf_file_path, max_memory_mb)
+        if text is None:
+            # not every extractor can read every layout, so the caller says which backend it trusts, if any
+            if not fallback_name or name == fallback_name:
+                raise MemoryError(f'more than {max_memory_mb} MB used while reading "{pdf_file_path}"')
+            # start over, mixing the layouts of two backends in one text could confuse the extractors
+            logging.warning(f'more than {max_memory_mb} MB used while reading "{pdf_file_path}" with "{name}", starting over with "{fallback_name}"')
+            text = PdfTextBackend._retrieve_text_within(fallback_name, pdf_file_path, max_memory_mb)
+            if text is None:
+                raise MemoryError(f'more than {max_memory_mb} MB used while reading "{pdf_file_path}", even with "{fallback_name}"')
+            name = fallback_name
+        if used_names is not None:
+            used_names.append(name)
+        return text
+
+    @staticmethod
+    def _retrieve_text_within(name, pdf_file_path, max_memory_mb):
+        if max_memory_mb:
+            gc.collect()
+            baseline_rss = PdfTextBackend._get_rss_bytes()
+        text = ''
+        page_texts = PdfTextBackend._iter_page_texts(name, pdf_file_path)
+        try:
+            for page_text in page_texts:
+                text += page_text
+                if max_memory_mb and PdfTextBackend._get_rss_bytes() - baseline_rss > max_memory_mb * 1024 * 1024:
+                    return None
+            return text
+        finally:
+            page_texts.close()
+
+    @staticmethod
+    def _iter_page_texts(name, pdf_file_path):
+        mapping = {
+            'pypdfium2': PdfTextBackend._iter_page_texts_pypdfium2,
+            'pymupdf': PdfTextBackend._iter_page_texts_pymupdf,
+            'pdfminer': PdfTextBackend._iter_page_texts_pdfminer,
+            'pdfplumber': PdfTextBackend._iter_page_texts_pdfplumber,
+        }
+        return mapping[name](pdf_file_path)
+
+    @staticmethod
+    def _get_rss_bytes():
+        if importlib.util.find_spec('psutil') is not None:
+            import psutil
+            return psutil.Process().memory_info().rss
+        if os.path.exists('/proc/self/statm'):
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        # only the peak is known here, so this errs on the side of falling back too early
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    @staticmethod
+    def _is_available(name):
+        mapping = {
+            'pypdfium2': 'pypdfium2',
+            'pymupdf': 'pymupdf',
+            'pdfminer': 'pdfminer',
+            'pdfplumber': 'pdfplumber',
+        }
+        if name == 'pymupdf' and importlib.util.find_spec('fitz') is not None:
+            return True
+        return importlib.util.find_spec(mapping[name]) is not None
+
+    @staticmethod
+    def _iter_page_texts_pypdfium2(pdf_file_path):
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(pdf_file_path)
+        try:
+            for page_index in range(len(pdf)):
+                page = pdf[page_index]
+                text_page = page.get_textpage()
+                text = text_page.get_text_range().replace('\r\n', '\n') + '\n'
+                text_page.close()
+                page.close()
+                yield text
+        finally:
+            pdf.close()
+
+    @staticmethod
+    def _iter_page_texts_pymupdf(pdf_file_path):
+        if importlib.util.find_spec('pymupdf') is not None:
+            import pymupdf
+        else:
+            import fitz as pymupdf
+
+        with pymupdf.open(pdf_file_path) as pdf:
+            for page_index in range(len(pdf)):
+                yield pdf[page_index].get_text()
+
+    @staticmethod
+    def _iter_page_texts_pdfminer(pdf_file_path):
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LAParams, LTTextContainer
+
+        # we only need lines of text, so skip the reading order analysis and vertical text detection
+        laparams = LAParams(line_margin=0.5, char_margin=2.0, word_margin=0.1, boxes_flow=None, detect_vertical=False, all_texts=False)
+        # extract_pages parses one page at a time, so nothing is kept once a page is consumed
+        for page_layout in extract_pages(pdf_file_path, laparams=laparams):
+            yield ''.join(element.get_text() for element in page_layout if isinstance(element, LTTextContainer))
+
+    @staticmethod
+    def _iter_page_texts_pdfplumber(pdf_file_path):
+        import pdfplumber
+
+        with pdfplumber.open(pdf_file_path) as pdf:
+            for page in pdf.pages:
+                text = page.extract_text()
+                # drop the cached chars and layout objects of the page as soon as its text is consumed
+                if hasattr(page, 'close'):
+                    page.close()
+                else:
+                    pdf.flush_cache()
+                yield text
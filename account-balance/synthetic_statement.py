@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import re
+import argparse
+import logging
+import csv
+import random
+
+
+class SyntheticStatement:
+    @staticmethod
+    def parse_args():
+        parser = argparse.ArgumentParser(description='Generate synthetic statements which look like the real ones to the extractors')
+
+        parser.add_argument('--output-directory-path', '-o', help='The output directory of statements')
+        parser.add_argument('--bank', choices=['bofa', 'chase'], help='The bank to imitate')
+        parser.add_argument('--count', '-n', type=int, default=12, help='How many statements to generate')
+        parser.add_argument('--page-count', '-p', type=int, default=3, help='How many pages every statement has')
+        parser.add_argument('--filler-line-count', '-f', type=int, default=40, help='How many transaction-like lines every page has')
+        parser.add_argument('--seed', type=int, default=0, help='The random seed')
+        parser.add_argument('--expected-file-path', '-e', help='Where to write the expected dates and balances')
+        parser.add_argument('--verbose', '-v', action='store_true', help='When you want to debug')
+
+        return parser.parse_args()
+
+    @staticmethod
+    def run(args):
+        SyntheticStatement._config_logging(args.verbose)
+
+        SyntheticStatement._check_args(args)
+
+        statements = SyntheticStatement.generate(args.bank, args.output_directory_path, args.count, args.page_count, args.filler_line_count, args.seed)
+        logging.info(f'generated {len(statements)} statements in "{args.output_directory_path}"')
+
+        if args.expected_file_path:
+            SyntheticStatement._write_expected(statements, args.expected_file_path)
+
+    @staticmethod
+    def generate(bank, output_directory_path, count, page_count, filler_line_count, seed):
+        rng = random.Random(seed)
+        os.makedirs(output_directory_path, exist_ok=True)
+
+        statements = []
+        for index in range(count):
+            year = 2000 + index // 12
+            month = index % 12 + 1
+            balances = {
+                'checking': SyntheticStatement._random_money(rng),
+                'savings': SyntheticStatement._random_money(rng),
+            }
+            if bank == 'bofa':
+                header_lines = SyntheticStatement._get_bofa_header_lines(year, month, balances['checking'])
+            else:
+                header_lines = SyntheticStatement._get_chase_header_lines(year, month, balances)
+
+            pages = []
+            for page_index in range(page_count):
+                lines = header_lines if page_index == 0 else []
+                # the last line of a page must be a filler, pdfplumber glues it to the first line of the next page
+                lines = lines + [SyntheticStatement._random_filler_line(rng, month) for _ in range(max(filler_line_count, 1))]
+                pages.append(lines)
+
+            file_path = os.path.join(output_directory_path, f'statement-{index + 1:04d}.pdf')
+            with open(file_path, 'wb') as f:
+                f.write(SyntheticStatement._render_pdf(pages))
+
+            statements.append({
+                'file_path': file_path,
+                'date': f'{year}/{month:02d}/{SyntheticStatement._get_last_day(year, month):02d}',
+                'checking': re.sub(',', '', balances['checking']),
+                'savings': re.sub(',', '', balances['savings']),
+            })
+        return statements
+
+    @staticmethod
+    def _get_bofa_header_lines(year, month, balance):
+        month_name = SyntheticStatement._get_month_name(month)
+        last_day = SyntheticStatement._get_last_day(year, month)
+        return [
+            'Bank of America Advantage Plus Banking',
+            f'for {month_name} 1, {year} to {month_name} {last_day}, {year} Account number: 0000 1234 5678',
+            'Account summary',
+            f'Beginning balance on {month_name} 1, {year} $1,000.00',
+            'Deposits and other additions 2,500.00',
+            'Withdrawals and other subtractions -1,250.00',
+            f'Ending balance on {month_name} {last_day}, {year} ${balance}',
+        ]
+
+    @staticmethod
+    def _get_chase_header_lines(year, month, balances):
+        month_name = SyntheticStatement._get_month_name(month)
+        last_day = SyntheticStatement._get_last_day(year, month)
+        return [
+            'JPMorgan Chase Bank, N.A.',
+            f'{month_name} 1, {year}through{month_name} {last_day}, {year}',
+            'Account Number: 000000123456789',
+            'CHECKING SUMMARY',
+            'Beginning Balance $1,000.00',
+            'Deposits and Additions 2,500.00',
+            f'Ending Balance ${balances["checking"]}',
+            'SAVINGS SUMMARY',
+            'Beginning Balance $5,000.00',
+            f'Ending Balance ${balances["savings"]}',
+        ]
+
+    @staticmethod
+    def _random_filler_line(rng, month):
+        merchants = ['COSTCO WHSE #1190', 'UWAJIMAYA SEATTLE', 'TMOBILE*AUTO PAY', 'CAPSULE CAFE', 'SAFEWAY #1234', 'AMAZON MKTPL*AB12CD']
+        cities = ['SEATTLE WA', 'LYNNWOOD WA', 'BELLEVUE WA', '800-123-4567 WA']
+        day = rng.randint(1, 28)
+        amount = f'{rng.randint(1, 999)}.{rng.randint(0, 99):02d}'
+        return f'{month:02d}/{day:02d} {rng.choice(merchants)} {rng.choice(cities)} {amount}'
+
+    @staticmethod
+    def _random_money(rng):
+        return f'{rng.randint(0, 99999):,}.{rng.randint(0, 99):02d}'
+
+    @staticmethod
+    def _get_month_name(month):
+        names = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
+        return names[month - 1]
+
+    @staticmethod
+    def _get_last_day(year, month):
+        if month == 2:
+            return 29 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 28
+        if month in [4, 6, 9, 11]:
+            return 30
+        return 31
+
+    @staticmethod
+    def _render_pdf(pages):
+        # a minimal pdf with one Helvetica text block per page, enough for every text backend
+        page_count = len(pages)
+        page_object_numbers = [4 + 2 * index for index in range(page_count)]
+        objects = {
+            1: b'<< /Type /Catalog /Pages 2 0 R >>',
+            2: f'<< /Type /Pages /Kids [{" ".join(f"{number} 0 R" for number in page_object_numbers)}] /Count {page_count} >>'.encode(),
+            3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        }
+        for page_object_number, lines in zip(page_object_numbers, pages):
+            content = SyntheticStatement._render_page_content(lines)
+            objects[page_object_number] = f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents {page_object_number + 1} 0 R >>'.encode()
+            objects[page_object_number + 1] = f'<< /Length {len(content)} >>\nstream\n'.encode() + content + b'\nendstream'
+
+        output = bytearray(b'%PDF-1.4\n')
+        offsets = {}
+        for number in sorted(objects):
+            offsets[number] = len(output)
+            output += f'{number} 0 obj\n'.encode() + objects[number] + b'\nendobj\n'
+
+        xref_offset = len(output)
+        output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+        for number in sorted(objects):
+            output += f'{offsets[number]:010d} 00000 n \n'.encode()
+        output += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n'.encode()
+        return bytes(output)
+
+    @staticmethod
+    def _render_page_content(lines):
+        leading = min(12, 720 / max(len(lines), 1))
+        font_size = leading * 0.8
+        commands = ['BT', f'/F1 {font_size:.2f} Tf', f'{leading:.2f} TL', '40 760 Td']
+        for line in lines:
+            escaped_line = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            commands.append(f'({escaped_line}) Tj T*')
+        commands.append('ET')
+        return '\n'.join(commands).encode('cp1252')
+
+    @staticmethod
+    def _write_expected(statements, expected_file_path):
+        with open(expected_file_path, 'w') as f:
+            writer = csv.writer(f)
+            writer.writerow(['file_path', 'date', 'checking', 'savings'])
+            for statement in statements:
+                writer.writerow([statement['file_path'], statement['date'], statement['checking'], statement['savings']])
+
+    @staticmethod
+    def _check_args(args):
+        if not args.output_directory_path:
+            raise Error('please specify --output-directory-path')
+        if not args.bank:
+            raise Error('please specify --bank')
+        if args.count < 1 or args.page_count < 1:
+            raise Error('--count and --page-count should be at least 1')
+        if args.filler_line_count < 0:
+            raise Error('--filler-line-count should not be negative')
+
+    @staticmethod
+    def _config_logging(verbose):
+        log_level = logging.DEBUG if verbose else logging.INFO
+        log_format = '%(levelname)s: %(message)s'
+        logging.basicConfig(level=log_level, format=log_format)
+
+
+class Error(Exception):
+    pass
+
+
+def main():
+    args = SyntheticStatement.parse_args()
+    SyntheticStatement.run(args)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+        sys.exit(0)
+    except Error as e:
+        logging.error(e)
+        sys.exit(1)
@@ -5,6 +5,7 @@ import argparse
 import re
 import logging
 import csv
+from purchase import Purchase
 
 
 class ChaseStatement:
@@ -22,11 +23,16 @@ class ChaseStatement:
     def run(args):
         ChaseStatement._config_logging()
 
-        statement_data = ChaseStatement._parse_statement(args.input_file_path)
-        if args.description_conversion_file_path:
-            statement_data = ChaseStatement._convert_descriptions(statement_data, args.description_conversion_file_path)
+        statement_data = ChaseStatement.parse(args.input_file_path, args.description_conversion_file_path)
         ChaseStatement._write_records(statement_data, args.output_file_path)
 
+    @staticmethod
+    def parse(input_file_path, description_conversion_file_path=None):
+        statement_data = ChaseStatement._parse_statement(input_file_path)
+        if description_conversion_file_path:
+            statement_data = ChaseStatement._convert_descriptions(statement_data, description_conversion_file_path)
+        return statement_data
+
     @staticmethod
     def _config_logging():
         log_level = logging.INFO
@@ -36,18 +42,13 @@ class ChaseStatement:
     @staticmethod
     def _parse_statement(input_file_path):
         with open(input_file_path) as f:
-            lines = f.readlines()
-
-        statement_data = []
-        for line in lines:
-            tokens = line.strip().split(' ')
-            statement_data.append({
-                'date': tokens[0],
-                'description': ' '.join(tokens[1:-1]),
-                'amount': tokens[-1]
-            })
-
-        return statement_data
+            for line in f:
+                tokens = line.strip().split(' ')
+                yield Purchase(
+                    date=tokens[0],
+                    description=' '.join(tokens[1:-1]),
+                    amount=tokens[-1],
+                )
 
     @staticmethod
     def _convert_descriptions(statement_data, description_conversion_file_path):
@@ -58,33 +59,29 @@ class ChaseStatement:
             for row in reader:
                 description_conversions[row['Description Regex Pattern']] = row['Substituting Name']
 
-        return [ChaseStatement._convert_entry_description(entry, description_conversions) for entry in statement_data]
+        return (ChaseStatement._convert_entry_description(entry, description_conversions) for entry in statement_data)
 
     @staticmethod
     def _convert_entry_description(entry, description_conversions):
         for pattern in description_conversions:
-            if re.search(pattern, entry['description']):
-                return {
-                    'date': entry['date'],
-                    'description': description_conversions[pattern],
-                    'amount': entry['amount'],
-                }
+            if re.search(pattern, entry.description):
+                return entry._replace(description=description_conversions[pattern])
         return entry
 
     @staticmethod
     def _write_records(statement_data, output_file_path):
         data_group_by_date = {}
         for entry in statement_data:
-            if entry['date'] not in data_group_by_date:
-                data_group_by_date[entry['date']] = []
-            data_group_by_date[entry['date']].append(entry)
+            if entry.date not in data_group_by_date:
+                data_group_by_date[entry.date] = []
+            data_group_by_date[entry.date].append(entry)
 
         with open(output_file_path, 'w') as f:
             writer = csv.writer(f)
             for date in sorted(data_group_by_date.keys()):
                 writer.writerow([date])
                 for entry in data_group_by_date[date]:
-                    writer.writerow([entry['description'], entry['amount']])
+                    writer.writerow([entry.description, entry.amount])
 
 
 class Error(Exception):
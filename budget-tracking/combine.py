@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 
 import sys
+import os
+import io
+import bisect
+import heapq
+import shutil
+import tempfile
+import json
 import argparse
 import re
 import logging
 import csv
+import datetime
+from purchase import Purchase
 
 
 class Combine:
@@ -13,7 +22,10 @@ class Combine:
         parser = argparse.ArgumentParser(description='Combine budget tracking spreadsheets.')
 
         parser.add_argument('--input-file-path', '-i', type=str, required=True, action='append', help='The input file to combine')
-        parser.add_argument('--output-file-path', '-o', type=str, required=True, help='The output file')
+        parser.add_argument('--deduplicate', '-d', action='store_true', help='Drop the purchases that already come from another input')
+        output_group = parser.add_mutually_exclusive_group(required=True)
+        output_group.add_argument('--output-file-path', '-o', type=str, help='The output file')
+        output_group.add_argument('--append-to', '-a', type=str, help='The existing combined file to merge the inputs into')
 
         return parser.parse_args()
 
@@ -21,9 +33,87 @@ class Combine:
     def run(args):
         Combine._config_logging()
 
-        budget_tracking_spreadsheets = Combine._read_budget_tracking_spreadsheets(args.input_file_path)
+        purchase_iterables = [Combine.read(input_file_path) for input_file_path in args.input_file_path]
+        if args.deduplicate:
+            dropped_counts = []
+            if args.append_to:
+                Combine.append_deduplicated(purchase_iterables, args.append_to, dropped_counts)
+            else:
+                Combine.write(list(Combine.deduplicate(purchase_iterables, dropped_counts)), args.output_file_path)
+            for input_file_path, dropped_count in zip(args.input_file_path, dropped_counts):
+                logging.info(f'dropped {dropped_count} duplicated purchases from "{input_file_path}"')
+        elif args.append_to:
+            Combine.append(Combine.combine(purchase_iterables), args.append_to)
+        else:
+            Combine.write(Combine.combine(purchase_iterables), args.output_file_path)
+
+    @staticmethod
+    def read(input_file_path):
+        with open(input_file_path) as f:
+            reader = csv.reader(f)
+            budget_tracking_spreadsheet = Combine._parse_budget_tracking_rows(reader)
+        return Combine._to_purchases(budget_tracking_spreadsheet)
+
+    @staticmethod
+    def combine(purchase_iterables):
+        budget_tracking_spreadsheets = [Combine._to_budget_tracking_spreadsheet(purchases) for purchases in purchase_iterables]
         budget_tracking_spreadsheet = Combine._combine_budget_tracking_spreadsheets(budget_tracking_spreadsheets)
-        Combine._write_budget_tracking_spreadsheet(budget_tracking_spreadsheet, args.output_file_path)
+        return Combine._to_purchases(budget_tracking_spreadsheet)
+
+    @staticmethod
+    def deduplicate(purchase_iterables, dropped_counts=None):
+        # the inputs are merged by date, so only the purchases of the current date are indexed
+        purchase_iterables = list(purchase_iterables)
+        if dropped_counts is None:
+            dropped_counts = []
+        dropped_counts[:] = [0] * len(purchase_iterables)
+        tagged_purchase_iterables = [Combine._tag_purchases(purchases, input_index) for input_index, purchases in enumerate(purchase_iterables)]
+
+        current_date = None
+        kept_counts = {}
+        seen_counts = {}
+        for input_index, purchase in heapq.merge(*tagged_purchase_iterables, key=lambda tagged_purchase: tagged_purchase[1].date):
+            if purchase.date != current_date:
+                current_date = purchase.date
+                kept_counts.clear()
+                seen_counts.clear()
+
+            key = Combine._get_deduplication_key(purchase)
+            # the n-th identical purchase of an input only duplicates the n-th one of another input
+            ordinal = seen_counts.get((input_index, key), 0) + 1
+            seen_counts[(input_index, key)] = ordinal
+            if ordinal <= kept_counts.get(key, 0):
+                dropped_counts[input_index] += 1
+                continue
+            kept_counts[key] = ordinal
+            yield purchase
+
+    @staticmethod
+    def _tag_purchases(purchases, input_index):
+        # statements list purchases in posting order, and a single input is small enough to sort in memory
+        for purchase in sorted(purchases, key=lambda purchase: purchase.date):
+            yield input_index, purchase
+
+    @staticmethod
+    def _get_deduplication_key(purchase):
+        description = ' '.join(purchase.description.split()).casefold()
+        amount = re.sub(r'[$,\s]', '', purchase.amount)
+        return description, amount
+
+    @staticmethod
+    def write(purchases, output_file_path):
+        budget_tracking_spreadsheet = Combine._to_budget_tracking_spreadsheet(purchases)
+        Combine._write_budget_tracking_spreadsheet(budget_tracking_spreadsheet, output_file_path)
+
+    @staticmethod
+    def append(purchases, combined_file_path):
+        budget_tracking_spreadsheet = Combine._to_budget_tracking_spreadsheet(purchases)
+        Combine._append_budget_tracking_spreadsheets([budget_tracking_spreadsheet], combined_file_path)
+
+    @staticmethod
+    def append_deduplicated(purchase_iterables, combined_file_path, dropped_counts=None):
+        budget_tracking_spreadsheets = [Combine._to_budget_tracking_spreadsheet(purchases) for purchases in purchase_iterables]
+        Combine._append_budget_tracking_spreadsheets(budget_tracking_spreadsheets, combined_file_path, True, dropped_counts)
 
     @staticmethod
     def _config_logging():
@@ -32,26 +122,39 @@ class Combine:
         logging.basicConfig(level=log_level, format=log_format)
 
     @staticmethod
-    def _read_budget_tracking_spreadsheets(input_file_paths):
-        budget_tracking_spreadsheets = []
-        for input_file_path in input_file_paths:
-            with open(input_file_path) as f:
-                reader = csv.reader(f)
-                budget_tracking_spreadsheet = {}
-                for row in reader:
-                    if len(row) == 1: # it's a date
-                        date = row[0]
-                        if date not in budget_tracking_spreadsheet:
-                            budget_tracking_spreadsheet[date] = []
-                    elif len(row) == 2: # it's a purchase
-                        description = row[0]
-                        amount = row[1]
-                        budget_tracking_spreadsheet[date].append({
-                            'description': description,
-                            'amount': amount
-                        })
-                budget_tracking_spreadsheets.append(budget_tracking_spreadsheet)
-        return budget_tracking_spreadsheets
+    def _to_budget_tracking_spreadsheet(purchases):
+        budget_tracking_spreadsheet = {}
+        for purchase in purchases:
+            if purchase.date not in budget_tracking_spreadsheet:
+                budget_tracking_spreadsheet[purchase.date] = []
+            budget_tracking_spreadsheet[purchase.date].append({
+                'description': purchase.description,
+                'amount': purchase.amount
+            })
+        return budget_tracking_spreadsheet
+
+    @staticmethod
+    def _to_purchases(budget_tracking_spreadsheet):
+        for date in sorted(budget_tracking_spreadsheet.keys()):
+            for entry in budget_tracking_spreadsheet[date]:
+                yield Purchase(date=date, description=entry['description'], amount=entry['amount'])
+
+    @staticmethod
+    def _parse_budget_tracking_rows(rows):
+        budget_tracking_spreadsheet = {}
+        for row in rows:
+            if len(row) == 1: # it's a date
+                date = row[0]
+                if date not in budget_tracking_spreadsheet:
+                    budget_tracking_spreadsheet[date] = []
+            elif len(row) == 2: # it's a purchase
+                description = row[0]
+                amount = row[1]
+                budget_tracking_spreadsheet[date].append({
+                    'description': description,
+                    'amount': amount
+                })
+        return budget_tracking_spreadsheet
 
     @staticmethod
     def _combine_budget_tracking_spreadsheets(budget_tracking_spreadsheets):
@@ -72,6 +175,159 @@ class Combine:
                 for entry in budget_tracking_spreadsheet[date]:
                     writer.writerow([entry['description'], entry['amount']])
 
+    @staticmethod
+    def _append_budget_tracking_spreadsheets(budget_tracking_spreadsheets, combined_file_path, deduplicate=False, dropped_counts=None):
+        if dropped_counts is None:
+            dropped_counts = []
+        dropped_counts[:] = [0] * len(budget_tracking_spreadsheets)
+
+        if not os.path.exists(combined_file_path):
+            open(combined_file_path, 'wb').close()
+
+        date_offsets = Combine._load_date_offsets(combined_file_path)
+        new_dates = [date for budget_tracking_spreadsheet in budget_tracking_spreadsheets for date in budget_tracking_spreadsheet]
+        if not new_dates:
+            return
+
+        # only the sections from the earliest new date onwards have to be rewritten
+        earliest_date = min(new_dates)
+        dates = [entry[0] for entry in date_offsets]
+        if deduplicate and dates:
+            Combine._check_same_year(dates[-1], new_dates, combined_file_path)
+        splice_index = bisect.bisect_left(dates, earliest_date)
+
+        with open(combined_file_path, 'rb') as f:
+            if splice_index == len(date_offsets):
+                splice_offset = f.seek(0, os.SEEK_END)
+                tail_budget_tracking_spreadsheet = {}
+            else:
+                splice_offset = date_offsets[splice_index][1]
+                f.seek(splice_offset)
+                tail_text = f.read().decode()
+                tail_budget_tracking_spreadsheet = Combine._parse_budget_tracking_rows(csv.reader(io.StringIO(tail_text, newline='')))
+
+        if deduplicate:
+            # every existing row a new one could duplicate has a date in the tail, so the tail is just one more input
+            all_dropped_counts = []
+            purchase_iterables = [Combine._to_purchases(tail_budget_tracking_spreadsheet)]
+            purchase_iterables += [Combine._to_purchases(budget_tracking_spreadsheet) for budget_tracking_spreadsheet in budget_tracking_spreadsheets]
+            purchases = Combine.deduplicate(purchase_iterables, all_dropped_counts)
+            merged_budget_tracking_spreadsheet = Combine._to_budget_tracking_spreadsheet(purchases)
+            dropped_counts[:] = all_dropped_counts[1:]
+        else:
+            merged_budget_tracking_spreadsheet = Combine._combine_budget_tracking_spreadsheets([tail_budget_tracking_spreadsheet] + budget_tracking_spreadsheets)
+
+        # render everything before touching the file, so a bad entry can't leave it half written
+        tail = bytearray()
+        tail_date_offsets = []
+        for date in sorted(merged_budget_tracking_spreadsheet.keys()):
+            tail_date_offsets.append([date, splice_offset + len(tail)])
+            tail += Combine._render_date_section(date, merged_budget_tracking_spreadsheet[date])
+
+        if splice_index == len(date_offsets):
+            logging.info(f'appending {len(merged_budget_tracking_spreadsheet)} dates to "{combined_file_path}"')
+            with open(combined_file_path, 'ab') as f:
+                f.write(tail)
+        else:
+            logging.info(f'rewriting "{combined_file_path}" from date {dates[splice_index]}')
+            Combine._replace_tail(combined_file_path, splice_offset, tail)
+
+        Combine._save_date_offsets(date_offsets[:splice_index] + tail_date_offsets, combined_file_path)
+
+    @staticmethod
+    def _check_same_year(last_date, new_dates, combined_file_path):
+        # the dates have no year, so next year's purchases would be merged into this year's and dropped as duplicates
+        last_day = Combine._get_day_of_year(last_date)
+        new_days = [Combine._get_day_of_year(date) for date in new_dates]
+        if last_day is None or None in new_days:
+            return
+        if last_day - min(new_days) > max(new_days) - min(new_days):
+            raise Error(f'the inputs start at {min(new_dates)}, long before the last date {last_date} of "{combined_file_path}", they look like the next year, please combine them into a new file')
+
+    @staticmethod
+    def _get_day_of_year(date):
+        match = re.match(r'^(\d\d)/(\d\d)$', date)
+        if not match:
+            return None
+        try:
+            # a leap year, so 02/29 is a valid date
+            return datetime.date(2000, int(match.group(1)), int(match.group(2))).timetuple().tm_yday
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _replace_tail(combined_file_path, splice_offset, tail):
+        # the existing rows are never truncated in place, the file is swapped only once the new one is complete
+        directory_path = os.path.dirname(os.path.abspath(combined_file_path))
+        with tempfile.NamedTemporaryFile('wb', dir=directory_path, delete=False) as temp_file:
+            try:
+                with open(combined_file_path, 'rb') as f:
+                    remaining_size = splice_offset
+                    while remaining_size:
+                        chunk = f.read(min(remaining_size, 1024 * 1024))
+                        temp_file.write(chunk)
+                        remaining_size -= len(chunk)
+                temp_file.write(tail)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            except BaseException:
+                temp_file.close()
+                os.unlink(temp_file.name)
+                raise
+        shutil.copymode(combined_file_path, temp_file.name)
+        os.replace(temp_file.name, combined_file_path)
+
+    @staticmethod
+    def _render_date_section(date, entries):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([date])
+        for entry in entries:
+            writer.writerow([entry['description'], entry['amount']])
+        return buffer.getvalue().encode()
+
+    @staticmethod
+    def _get_index_file_path(combined_file_path):
+        return f'{combined_file_path}.index'
+
+    @staticmethod
+    def _load_date_offsets(combined_file_path):
+        stat = os.stat(combined_file_path)
+        index_file_path = Combine._get_index_file_path(combined_file_path)
+        if os.path.exists(index_file_path):
+            try:
+                with open(index_file_path) as f:
+                    index = json.load(f)
+                if index['size'] == stat.st_size and index['mtime_ns'] == stat.st_mtime_ns:
+                    return index['date_offsets']
+            except (ValueError, KeyError, TypeError):
+                pass
+            logging.info(f'index file "{index_file_path}" is stale, rebuilding it')
+        return Combine._scan_date_offsets(combined_file_path)
+
+    @staticmethod
+    def _scan_date_offsets(combined_file_path):
+        date_offsets = []
+        offset = 0
+        with open(combined_file_path, 'rb') as f:
+            for line in f:
+                row = next(csv.reader([line.decode()]), [])
+                if len(row) == 1: # it's a date
+                    date_offsets.append([row[0], offset])
+                offset += len(line)
+        return date_offsets
+
+    @staticmethod
+    def _save_date_offsets(date_offsets, combined_file_path):
+        stat = os.stat(combined_file_path)
+        index_file_path = Combine._get_index_file_path(combined_file_path)
+        with open(index_file_path, 'w') as f:
+            json.dump({
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'date_offsets': date_offsets,
+            }, f)
+
 
 class Error(Exception):
     pass
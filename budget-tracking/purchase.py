@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+
+import collections
+
+
+Purchase = collections.namedtuple('Purchase', ['date', 'description', 'amount'])
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import argparse
+import logging
+import json
+import subprocess
+
+
+class CheckOutdatedFiles:
+    @staticmethod
+    def parse_args():
+        parser = argparse.ArgumentParser(description='Check if the localized files are up-to-date with their English counterparts.')
+
+        parser.add_argument('language_code', help='The language code, e.g. zh-tw')
+        parser.add_argument('en_target_commit_hash', nargs='?', help='The commit on the main branch your change is based on')
+        parser.add_argument('--repo-path', '-C', default='.', help='The root directory of the glossary git project')
+        parser.add_argument('--main-branch', default='main', help='The branch of the English files')
+        parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+        parser.add_argument('--verbose', '-v', action='store_true', help='Also list the files which are up-to-date')
+
+        return parser.parse_args()
+
+    @staticmethod
+    def run(args):
+        CheckOutdatedFiles._config_logging(args.verbose)
+
+        results = CheckOutdatedFiles.check(args.repo_path, args.language_code, args.en_target_commit_hash, args.main_branch)
+
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            CheckOutdatedFiles._print_results(results, args.verbose)
+
+    @staticmethod
+    def check(repo_path, language_code, en_target_commit_hash=None, main_branch='main'):
+        until_timestamp = None
+        if en_target_commit_hash:
+            until_timestamp = int(CheckOutdatedFiles._git(repo_path, ['log', '-n', '1', '--format=%at', en_target_commit_hash]).strip())
+
+        # one walk per branch instead of two git processes per file
+        localized_commits = CheckOutdatedFiles._index_last_commits(repo_path, 'HEAD', f'content/{language_code}')
+        en_commits = CheckOutdatedFiles._index_commits(repo_path, main_branch, 'content/en')
+
+        localized_prefix = f'content/{language_code}/'
+        results = []
+        for localized_file_path in CheckOutdatedFiles._list_localized_file_paths(repo_path, language_code):
+            # only the directory is swapped, the language code can also show up earlier in the path, e.g. "te" in "content"
+            en_file_path = 'content/en/' + localized_file_path[len(localized_prefix):]
+            localized_commit = localized_commits.get(localized_file_path)
+            since_timestamp = localized_commit['author_timestamp'] if localized_commit else None
+
+            newer_en_commits = []
+            for en_commit in en_commits.get(en_file_path, []):
+                # same semantics as `git log --since --until`, which look at the committer date
+                if since_timestamp is not None and en_commit['committer_timestamp'] < since_timestamp:
+                    continue
+                if until_timestamp is not None and en_commit['committer_timestamp'] > until_timestamp:
+                    continue
+                newer_en_commits.append(en_commit)
+
+            results.append({
+                'localized_file_path': localized_file_path,
+                'en_file_path': en_file_path,
+                'localized_commit': localized_commit,
+                'newer_en_commits': newer_en_commits,
+            })
+        return results
+
+    @staticmethod
+    def _index_last_commits(repo_path, revision, path):
+        last_commits = {}
+        for commit, file_paths in CheckOutdatedFiles._walk_log(repo_path, revision, path):
+            for file_path in file_paths:
+                if file_path not in last_commits:
+                    last_commits[file_path] = commit
+        return last_commits
+
+    @staticmethod
+    def _index_commits(repo_path, revision, path):
+        commits = {}
+        for commit, file_paths in CheckOutdatedFiles._walk_log(repo_path, revision, path):
+            for file_path in file_paths:
+                if file_path not in commits:
+                    commits[file_path] = []
+                commits[file_path].append(commit)
+        return commits
+
+    @staticmethod
+    def _walk_log(repo_path, revision, path):
+        # without quotePath=false git C-quotes non-ASCII paths, and they would never match the files on disk
+        output = CheckOutdatedFiles._git(repo_path, ['-c', 'core.quotePath=false', 'log', '--no-renames', '--name-only', '--format=%x00%H %at %ct %s', revision, '--', path])
+        for chunk in output.split('\0')[1:]:
+            lines = chunk.strip('\n').split('\n')
+            commit_hash, author_timestamp, committer_timestamp, subject = (lines[0].split(' ', 3) + [''])[:4]
+            commit = {
+                'hash': commit_hash,
+                'author_timestamp': int(author_timestamp),
+                'committer_timestamp': int(committer_timestamp),
+                'subject': subject,
+            }
+            yield commit, [line for line in lines[1:] if line]
+
+    @staticmethod
+    def _list_localized_file_paths(repo_path, language_code):
+        localized_directory_path = os.path.join(repo_path, 'content', language_code)
+        if not os.path.isdir(localized_directory_path):
+            raise Error(f'directory not found: {localized_directory_path}')
+
+        file_paths = []
+        for dir_path, _, filenames in os.walk(localized_directory_path):
+            for filename in filenames:
+                file_path = os.path.relpath(os.path.join(dir_path, filename), repo_path)
+                file_paths.append(file_path.replace(os.sep, '/'))
+        return sorted(file_paths)
+
+    @staticmethod
+    def _git(repo_path, git_args):
+        try:
+            completed_process = subprocess.run(['git', '-C', repo_path] + git_args, capture_output=True, text=True, check=True)
+        except FileNotFoundError:
+            raise Error('git not found')
+        except subprocess.CalledProcessError as e:
+            raise Error(f'git {" ".join(git_args)} failed: {e.stderr.strip()}')
+        return completed_process.stdout
+
+    @staticmethod
+    def _print_results(results, verbose):
+        outdated_count = 0
+        for result in results:
+            if not result['newer_en_commits']:
+                logging.debug(f'{result["localized_file_path"]} is up-to-date')
+                continue
+            outdated_count += 1
+            print(f'{result["localized_file_path"]} is behind {result["en_file_path"]}:')
+            for en_commit in result['newer_en_commits']:
+                print(f'  {en_commit["hash"]} {en_commit["subject"]}')
+        print(f'check done, {outdated_count} of {len(results)} files are outdated')
+
+    @staticmethod
+    def _config_logging(verbose):
+        log_level = logging.DEBUG if verbose else logging.INFO
+        log_format = '%(levelname)s: %(message)s'
+        logging.basicConfig(level=log_level, format=log_format)
+
+
+class Error(Exception):
+    pass
+
+
+def main():
+    args = CheckOutdatedFiles.parse_args()
+    CheckOutdatedFiles.run(args)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+        sys.exit(0)
+    except Error as e:
+        logging.error(e)
+        sys.exit(1)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import argparse
+import asyncio
+import logging
+import random
+import aiohttp
+
+
+class Scanner:
+    @staticmethod
+    def parse_args():
+        parser = argparse.ArgumentParser(description='Watch Global Entry interview locations and tell you when a sooner slot shows up.')
+
+        parser.add_argument('location_ids', nargs='+', help='The location IDs, you can see them on the scheduling website with browser debugging tool')
+        parser.add_argument('--base-url', default='https://ttp.cbp.dhs.gov', help='The scheduler API server, change it to test against a local stub')
+        parser.add_argument('--min-interval', type=float, default=20, help='The shortest seconds between two polls of a location')
+        parser.add_argument('--max-interval', type=float, default=60, help='The longest seconds between two polls of a location')
+        parser.add_argument('--notify', '-n', action='append', choices=['bell', 'say', 'command'], help='How to tell you, can specify multiple times, defaults to bell')
+        parser.add_argument('--command', '-c', help='The shell command for --notify command, gets LOCATION_ID and SLOT_TIME in the environment')
+        parser.add_argument('--verbose', '-v', action='store_true', help='When you want to debug')
+
+        return parser.parse_args()
+
+    @staticmethod
+    def run(args):
+        Scanner._config_logging(args.verbose)
+
+        Scanner._check_args(args)
+
+        asyncio.run(Scanner._scan(args))
+
+    @staticmethod
+    async def _scan(args):
+        notifiers = [Scanner._get_notifier(name) for name in args.notify or ['bell']]
+        soonest_times = {}
+
+        # a single keep-alive connection is shared by all the locations
+        connector = aiohttp.TCPConnector(limit=1)
+        timeout = aiohttp.ClientTimeout(total=30)
+        async with aiohttp.ClientSession(base_url=args.base_url, connector=connector, timeout=timeout) as session:
+            await asyncio.gather(*[Scanner._poll_location(session, args, location_id, notifiers, soonest_times) for location_id in args.location_ids])
+
+    @staticmethod
+    async def _poll_location(session, args, location_id, notifiers, soonest_times):
+        interval = args.min_interval
+        error_count = 0
+        previous_slot_time = None
+        is_baseline = True
+
+        while True:
+            try:
+                slot_time, retry_after = await Scanner._get_soonest_slot_time(session, location_id)
+                failed = retry_after is not None
+                if failed:
+                    logging.warning(f'location {location_id}: throttled by the server')
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError) as e:
+                slot_time, retry_after = None, None
+                failed = True
+                logging.warning(f'location {location_id}: polling failed: {e!r}')
+
+            if failed:
+                # back off exponentially, the count is capped so the power can't overflow a float after a long outage
+                error_count = min(error_count + 1, 16)
+                interval = min(args.max_interval, args.min_interval * 2 ** error_count)
+                logging.debug(f'location {location_id}: backing off for about {max(interval, retry_after or 0):.0f} seconds')
+            else:
+                error_count = 0
+                interval = Scanner._adapt_interval(args, interval, slot_time != previous_slot_time)
+                previous_slot_time = slot_time
+
+                if is_baseline:
+                    is_baseline = False
+                    soonest_times[location_id] = slot_time
+                    logging.info(f'location {location_id}: the baseline interview time is {slot_time}')
+                elif Scanner._is_sooner(slot_time, soonest_times[location_id]):
+                    soonest_times[location_id] = slot_time
+                    logging.info(f'location {location_id}: you can schedule an appointment at {slot_time}')
+                    for notifier in notifiers:
+                        await notifier(args, location_id, slot_time)
+
+            # the jitter comes first, so it can never make us poll sooner than the server asks for
+            await asyncio.sleep(max(Scanner._jitter(interval), retry_after or 0))
+
+    @staticmethod
+    async def _get_soonest_slot_time(session, location_id):
+        params = {
+            'orderBy': 'soonest',
+            'limit': '1',
+            'locationId': location_id,
+            'minimum': '1',
+        }
+        async with session.get('/schedulerapi/slots', params=params) as response:
+            if response.status == 429 or response.status == 503:
+                retry_after = response.headers.get('Retry-After', '')
+                return None, float(retry_after) if retry_after.isdigit() else 0.0
+            response.raise_for_status()
+            slots = await response.json(content_type=None)
+        if not isinstance(slots, list):
+            raise ValueError(f'unexpected response: {slots!r}')
+        if not slots:
+            return None, None
+        if not isinstance(slots[0], dict) or not isinstance(slots[0].get('startTimestamp'), str):
+            raise ValueError(f'unexpected slot: {slots[0]!r}')
+        return slots[0]['startTimestamp'], None
+
+    @staticmethod
+    def _adapt_interval(args, interval, changed):
+        # slots move around while people are booking, so poll faster then and slower when it's quiet
+        if changed:
+            return max(args.min_interval, interval / 2)
+        return min(args.max_interval, interval * 1.25)
+
+    @staticmethod
+    def _jitter(interval):
+        return interval * random.uniform(0.8, 1.2)
+
+    @staticmethod
+    def _is_sooner(slot_time, soonest_time):
+        if slot_time is None:
+            return False
+        return soonest_time is None or slot_time < soonest_time
+
+    @staticmethod
+    def _get_notifier(name):
+        mapping = {
+            'bell': Scanner._notify_bell,
+            'say': Scanner._notify_say,
+            'command': Scanner._notify_command,
+        }
+        return mapping[name]
+
+    @staticmethod
+    async def _notify_bell(args, location_id, slot_time):
+        print(f'\aCongratulations! You can schedule an appointment at {slot_time} in location {location_id}.', flush=True)
+
+    @staticmethod
+    async def _notify_say(args, location_id, slot_time):
+        await Scanner._run_command(['say', f'you can schedule an appointment at {slot_time}'])
+
+    @staticmethod
+    async def _notify_command(args, location_id, slot_time):
+        env = {
+            'LOCATION_ID': location_id,
+            'SLOT_TIME': slot_time,
+        }
+        await Scanner._run_command(args.command, env)
+
+    @staticmethod
+    async def _run_command(command, env=None):
+        try:
+            if isinstance(command, str):
+                process = await asyncio.create_subprocess_shell(command, env={**os.environ, **(env or {})})
+            else:
+                process = await asyncio.create_subprocess_exec(*command)
+            await process.wait()
+        except OSError as e:
+            logging.warning(f'failed to notify with {command}: {e}')
+
+    @staticmethod
+    def _check_args(args):
+        if args.min_interval <= 0:
+            raise Error('--min-interval should be positive')
+        if args.max_interval < args.min_interval:
+            raise Error('--max-interval should not be less than --min-interval')
+        if args.notify and 'command' in args.notify and not args.command:
+            raise Error('please specify --command')
+
+    @staticmethod
+    def _config_logging(verbose):
+        log_level = logging.DEBUG if verbose else logging.INFO
+        log_format = '%(asctime)s %(levelname)s: %(message)s'
+        logging.basicConfig(level=log_level, format=log_format)
+
+
+class Error(Exception):
+    pass
+
+
+def main():
+    args = Scanner.parse_args()
+    Scanner.run(args)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+        sys.exit(0)
+    except Error as e:
+        logging.error(e)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        sys.exit(0)